@@ -1,12 +1,122 @@
 import pandas as pd
-from scipy.optimize import newton
-from .Single_Asset import Single_Asset
+import numpy as np
+from .Single_Asset import Single_Asset, read_sheets, njit
 # Relative import used here because Portfolio is imported in main.py
 # If running Portfolio.py independently, remove the relative import dot above
-import matplotlib.pyplot as plt
-import warnings
 
-warnings.filterwarnings('ignore')
+
+@njit(cache=True)
+def _solve_nav_after(sb: np.ndarray, wa: np.ndarray, pa: np.ndarray, f: np.ndarray, navb: float) -> float:
+    """
+    Solve the NAV right after rebalancing using a fundamental relationship that the change in NAV should equal
+    fee incurred; total fee is simply the sum over all assets; and for each asset its fee is calculated as
+    its fee rate times the price you rebalance at times the absolute change of shares
+    Since prices are positive, the relationship reads sum(|sb * pa - wa * x| * f) + x = navb, whose left-hand side
+    is piecewise linear and increasing in x with breakpoints at sb * pa / wa; hence we locate the segment that
+    contains the root and solve the linear equation on it directly instead of iterating
+    :param np.ndarray sb: shares right before rebalancing
+    :param np.ndarray wa: weight right after rebalancing
+    :param np.ndarray pa: closing prices right after rebalancing, i.e. the prices you use to rebalance
+    :param np.ndarray f: fee rate vector
+    :param float navb: NAV right before rebalancing
+    :return float: NAV right after rebalancing
+    """
+    vb = sb * pa    # value of each asset right before rebalancing
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Step 1: locate the segment containing the root by evaluating the left-hand side at each breakpoint
+    breakpoints = np.sort(vb[wa != 0] / wa[wa != 0])
+    residuals = np.empty(len(breakpoints))
+    for i in range(len(breakpoints)):
+        residuals[i] = (np.abs(vb - wa * breakpoints[i]) * f).sum() + breakpoints[i] - navb
+    k = np.searchsorted(residuals, 0.0)
+    # residuals are increasing in breakpoints, so the root lies between the (k-1)-th and the k-th breakpoint
+    if k < len(breakpoints) and residuals[k] == 0:
+        return breakpoints[k]
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Step 2: sign of each absolute value term is constant within the segment, take any inner point to find it
+    if len(breakpoints) == 0:
+        x = navb
+    elif k == 0:
+        x = breakpoints[0] - 1
+    elif k == len(breakpoints):
+        x = breakpoints[-1] + 1
+    else:
+        x = (breakpoints[k - 1] + breakpoints[k]) / 2
+    sign = np.sign(vb - wa * x)
+    return (navb - (sign * vb * f).sum()) / (1 - (sign * wa * f).sum())
+
+
+@njit(cache=True)
+def _run_backtest(price: np.ndarray, weight: np.ndarray, rebal_mask: np.ndarray, fee_rate: np.ndarray):
+    """
+    Backtest the portfolio on raw arrays, see Portfolio.generate_nav
+    :param np.ndarray price: normalized closing prices, one row per trading date and one column per asset
+    :param np.ndarray weight: input weight aligned to trading dates, only rows on rebalancing dates are meaningful
+    :param np.ndarray rebal_mask: whether each trading date is a rebalancing date
+    :param np.ndarray fee_rate: fee rate vector
+    :return tuple: shares, actual weight, NAV and fee
+    """
+    n_days, n_assets = price.shape
+    shares = np.empty((n_days, n_assets))
+    actual_weight = np.empty((n_days, n_assets))
+    fee = np.empty(n_days)
+    nav = np.empty(n_days)
+
+    # Between two rebalancing dates shares are constant, so NAV over the whole segment is the NAV on the rebalancing
+    # date plus price increments since then times shares held; hence we only iterate over rebalancing dates
+    rebal_idx = np.flatnonzero(rebal_mask)
+    segment_end = np.append(rebal_idx[1:], n_days)
+    no_fee = not (fee_rate != 0).any()
+    for i in range(len(rebal_idx)):
+        r, r_next = rebal_idx[i], segment_end[i]
+
+        if r == 0:    # for the start date...
+            actual_weight[r] = weight[r]    # actual weight equals input weight
+            nav[r] = 1.0    # normalize NAV to 1
+            shares[r] = actual_weight[r] / price[r]
+            # value over price equals amt, nav of 1 omitted
+            fee[r] = (np.abs(actual_weight[r]) * fee_rate).sum()
+            # building positions from zero shares at normalized prices of 1, fee is simply |weight| times fee rate
+
+        else:   # for the remaining rebalancing dates...
+            prev = r - 1
+            price_prev, shares_prev, nav_prev = price[prev], shares[prev], nav[prev]
+            # look up the previous date only once, shares right before rebalancing equals previous date
+            price_r, weight_r = price[r], weight[r]
+            nav_before = nav_prev + (shares_prev * (price_r - price_prev)).sum()
+            if not (np.isfinite(nav_before) and np.isfinite(weight_r).all()):
+                raise ValueError("Cannot generate NAV series due to unexpected value from data or weight.")
+
+            if (shares_prev * price_r / nav_before == weight_r).all():
+                nav_after = nav_before
+                shares[r] = shares_prev
+                # weight right before rebalancing is already exactly as wanted, hence nothing traded and no fee
+            else:
+                if no_fee:
+                    nav_after = nav_before    # no fee incurred if fee rates are all 0
+                else:
+                    nav_after = _solve_nav_after(shares_prev, weight_r, price_r, fee_rate, nav_before)
+                    # Solve NAV after rebalancing s.t. weight after rebalancing is as wanted and fee is subtracted
+                    # from NAV
+                shares[r] = weight_r * nav_after / price_r
+            fee[r] = nav_before - nav_after
+            nav[r] = nav_after
+            actual_weight[r] = weight_r
+
+        # for the following non-rebalancing dates...
+        shares_r, price_r, nav_r = shares[r], price[r], nav[r]
+        shares[r + 1:r_next] = shares_r
+        # number of shares unchanged, i.e. NOT rebalanced
+        fee[r + 1:r_next] = 0   # obvsly no fee incurred, since no rebalancing
+        price_segment = price[r + 1:r_next]
+        nav[r + 1:r_next] = nav_r + ((price_segment - price_r) * shares_r).sum(axis=1)
+        # NAV's increase comes from sum of price increment times shares held over assets
+        actual_weight[r + 1:r_next] = shares_r * price_segment / np.expand_dims(nav[r + 1:r_next], 1)
+        # actual weight by definition is value of each asset over NAV
+
+    return shares, actual_weight, nav, fee
 
 
 class Portfolio:
@@ -41,14 +151,21 @@ class Portfolio:
         :param str data_sheet_name: name of the sheet containing weight series, default 权重
         """
         self.input_path = input_path
-        self.data = pd.read_excel(self.input_path, sheet_name=data_sheet_name, index_col=0)
-        self.data.sort_index(ascending=True, inplace=True)
-        self.weight = pd.read_excel(self.input_path, sheet_name=weight_sheet_name, index_col=0)
-        self.weight.sort_index(ascending=True, inplace=True)
-
-        self.data = self.data[self.weight.columns]
-        # only keep columns in self.data that has weight information; hence if not loading closing price and weight
-        # series from an local Excel file, the user will need to do this explicitly before initializing a backtester
+        sheets = read_sheets(self.input_path, [data_sheet_name, weight_sheet_name])
+        self.load_data(data=sheets[data_sheet_name], weight=sheets[weight_sheet_name])
+
+    def load_data(self, data: pd.DataFrame, weight: pd.DataFrame):
+        """
+        Load closing price series and weight series data that are already loaded elsewhere, e.g. shared with a
+        Single_Asset backtester s.t. the same Excel sheet is not parsed twice
+        Neither of the given dataframes is modified
+        :param pd.DataFrame data: closing price series
+        :param pd.DataFrame weight: weight series
+        """
+        self.weight = weight.sort_index(ascending=True)
+        self.data = data.sort_index(ascending=True)[self.weight.columns]
+        # only keep columns in self.data that has weight information; hence if passing closing price and weight series
+        # to the constructor instead, the user will need to do this explicitly before initializing a backtester
         # now columns in self.data also aligns with those in self.weight
 
     def load_fee_rates(self, high_risk_name_list=None, high_risk_fee_rate=None, low_risk_name_list=None,
@@ -60,14 +177,16 @@ class Portfolio:
         :param list low_risk_name_list: list of names of low risk assets (excluding cash)
         :param float low_risk_fee_rate: fee rate for low risk assets (excluding cash)
         """
+        high_risk_names = frozenset(high_risk_name_list or ())
+        low_risk_names = frozenset(low_risk_name_list or ())
 
-        duplicate_assets = list(set(high_risk_name_list) & set(low_risk_name_list))
-        if len(duplicate_assets) > 0:
+        duplicate_assets = high_risk_names & low_risk_names
+        if duplicate_assets:
             raise ValueError('assets found in both high and low risk asset name lists: %s.' %
                              ', '.join(duplicate_assets))
 
-        unspecified_assets = list(set(self.weight.columns) - (set(high_risk_name_list) | set(low_risk_name_list)))
-        if len(unspecified_assets) > 0:
+        unspecified_assets = frozenset(self.weight.columns) - (high_risk_names | low_risk_names)
+        if unspecified_assets:
             raise ValueError('risk level unspecified for assets: %s.' % ', '.join(unspecified_assets))
 
         self.high_risk_name_list, self.high_risk_fee_rate = high_risk_name_list, high_risk_fee_rate
@@ -96,31 +215,23 @@ class Portfolio:
         # Backtesting is essentially imposing some sort of weighting structure on those NAV series, hence we adjust
         # the weight dataframe s.t. its index is a subset of that of the NAV dataframe
 
-        date_adjusted_weight = pd.DataFrame(columns=self.weight.columns)
-
-        for date in self.weight.index:  # iterate all dates in the weight dataframe
-            
-            # Check whether the value of weight is valid.
-            for column_name in self.weight.columns:
-                if abs(self.weight.loc[date,column_name]) > 1:
-                    raise ValueError("Unexpected weight value: the absolute value of assect's weight is greater than 1.")
-
-            if date in self.data.index:    # if date exists in the NAV dataframe, it can be safely kept
-                date_adjusted_weight.loc[date] = self.weight.loc[date]
+        if (self.weight.abs() > 1).any(axis=None):    # check whether the value of weight is valid
+            raise ValueError("Unexpected weight value: the absolute value of assect's weight is greater than 1.")
 
-            else:   # if date does NOT exist in the NAV dataframe...
-                nearest_closing_date = pd.Series(self.data.index, index=self.data.index).loc[:date].iloc[-1]
+        trading_dates = self.data.index
+        nearest_closing_date = trading_dates[trading_dates.searchsorted(self.weight.index, side='right') - 1]
+        # for each date in the weight dataframe, the nearest closing date on or before it; dates that exist in the NAV
+        # dataframe are mapped to themselves and can be safely kept
 
-                if nearest_closing_date in self.weight.index:
-                    # but weight information for the nearest closing date is already specified...
-                    continue    # then we simply discard it
-
-                else:
-                    # and weight information for the nearest closing date is NOT specified...
-                    date_adjusted_weight.loc[nearest_closing_date] = self.weight.loc[date]
-                    # then we move it to the nearest closing date, based on consideration that this is desired for
-                    # scenarios like monthly backtesting where weight series are indexed by last calendar dates of each
-                    # month instead of last trading date
+        keep = self.weight.index.isin(trading_dates) | ~nearest_closing_date.isin(self.weight.index)
+        # if a date does NOT exist in the NAV dataframe but weight information for its nearest closing date is already
+        # specified, we simply discard it; otherwise we move it to the nearest closing date, based on consideration that
+        # this is desired for scenarios like monthly backtesting where weight series are indexed by last calendar dates
+        # of each month instead of last trading date
+        date_adjusted_weight = self.weight.loc[keep]
+        date_adjusted_weight.index = nearest_closing_date[keep]
+        date_adjusted_weight = date_adjusted_weight.loc[~date_adjusted_weight.index.duplicated(keep='last')]
+        # if several dates are moved to the same nearest closing date, the latest weight information prevails
 
         # --------------------------------------------------------------------------------------------------------------
         # Step 3: final processing
@@ -128,181 +239,91 @@ class Portfolio:
         # again s.t. their indices agree on the initial start date, but not necessarily the end date because you can
         # still backtest your portfolio for as long as NAV series allow after the last rebalancing
         date_adjusted_weight.sort_index(ascending=True, inplace=True)
-        self.weight = date_adjusted_weight
-        self.data = self.data.loc[self.weight.index[0]:]
-
-    def calculate_fee(self, sb: pd.Series, sa: pd.Series, f: pd.Series, pa: pd.Series) -> float:
-        """
-        Calculate fee incurred for a given rebalancing
-        :param pd.Series sb: shares right before rebalancing
-        :param pd.Series sa: shares right after rebalancing
-        :param pd.Series f: fee rate vector
-        :param pd.Series pa: closing prices right after rebalancing, i.e. the prices you use to rebalance
-        :return float: fee incurred for the given rebalancing
-        """
-        return sum(abs(sb - sa) * f * pa)
+        self.weight = date_adjusted_weight.astype(np.float64)
+        self.data = self.data.loc[self.weight.index[0]:].astype(np.float64)
+        # make sure both dataframes are of float64 dtype, e.g. user supplied dataframes could be of object dtype, s.t.
+        # all calculations afterwards run on contiguous float64 arrays
 
     def generate_nav(self):
         """
-        Generate NAV series of the portfolio based on closing prices and
+        Generate NAV series of the portfolio based on closing prices and weights
         """
         # --------------------------------------------------------------------------------------------------------------
-        # Step 1: generate a bunch of dataframes and series to store various results
-        data = self.data / self.data.iloc[0]
+        # Step 1: convert closing prices and weights to raw arrays
+        if not self.weight.index.isin(self.data.index).all() or self.weight.index[0] != self.data.index[0]:
+            raise ValueError('weight dates must be trading dates, starting on the first trading date; call slice() '
+                             'before generate_nav() to align them.')
+        price = self.data.to_numpy(dtype=np.float64)
+        price = price / price[0]
         # normalize intial prices to 1 for the concern of floating point number precision
-        input_weight = self.weight
-
-        portfolio_stats = pd.DataFrame(index=data.index)
-        shares = pd.DataFrame(index=data.index, columns=data.columns)
-        actual_weight = pd.DataFrame(index=data.index, columns=data.columns)
-        turnover_ratio = pd.DataFrame(index=data.index, columns=data.columns)
-        fee = pd.Series(index=data.index)
-        fee_rate = pd.Series(index=data.columns)
-        nav = pd.Series(index=data.index)
+        rebal_idx = self.data.index.searchsorted(self.weight.index)
+        # the weight dataframe's index is checked above to be a subset of the NAV dataframe's index, hence positions of
+        # rebalancing dates can be located by binary search
+        is_rebal = np.zeros(len(self.data.index), dtype=np.bool_)
+        is_rebal[rebal_idx] = True
+        weight_arr = np.full(price.shape, np.nan)
+        weight_arr[rebal_idx] = self.weight.to_numpy(dtype=np.float64)
+        # input weight aligned to trading dates, only rows on rebalancing dates are meaningful
 
         # --------------------------------------------------------------------------------------------------------------
-        # Step 2: fill in the fee rate vector, then define a function for root solving NAV after rebalancing
-        for asset in fee_rate.index:
-            if asset in self.high_risk_name_list:
-                fee_rate.loc[asset] = self.high_risk_fee_rate
-            elif asset in self.low_risk_name_list:
-                fee_rate.loc[asset] = self.low_risk_fee_rate
-
-        def nav_equation(x: float, sb: pd.Series, wa: pd.Series, pa: pd.Series, f: pd.Series, navb: float):
-            """
-            Solve the NAV right after rebalancing using a fundamental relationship that the change in NAV should equal
-            fee incurred; total fee is simply the sum over all assets; and for each asset its fee is calculated as
-            its fee rate times the price you rebalance at times the absolute change of shares
-            :param pd.Series sb: shares right before rebalancing
-            :param pd.Series wa: weight right after rebalancing
-            :param pd.Series pa: closing prices right after rebalancing, i.e. the prices you use to rebalance
-            :param pd.Series f: fee rate vector
-            :param float navb: NAV right before rebalancing
-            :return float: return the value of the root solving function, i.e. x is the solution when this function
-            returns 0
-            """
-            return self.calculate_fee(sb=sb, sa=(wa/pa)*x, f=f, pa=pa) - navb + x
+        # Step 2: fill in the fee rate vector
+        assets = self.data.columns.to_numpy()
+        is_high_risk = np.isin(assets, list(self.high_risk_name_list or ()))
+        is_low_risk = np.isin(assets, list(self.low_risk_name_list or ()))
+        fee_rate = np.where(is_high_risk, self.high_risk_fee_rate,
+                            np.where(is_low_risk, self.low_risk_fee_rate, 0.0)).astype(np.float64)
 
         # --------------------------------------------------------------------------------------------------------------
         # Step 3: backtest the portfolio, calculate detailed statistics
-        for idx, date in enumerate(data.index):
-
-            if idx == 0:    # for the start date...
-                actual_weight.loc[date] = input_weight.loc[date]    # actual weight equals input weight
-                nav.loc[date] = 1.0    # normalize NAV to 1
-                shares.loc[date] = actual_weight.loc[date] / data.loc[date]
-                # value over price equals amt, nav of 1 omitted
-                fee.loc[date] = self.calculate_fee(sb=pd.Series([0] * len(data.columns), index=data.columns),
-                                                   sa=shares.loc[date], f=fee_rate, pa=data.loc[date])
-                turnover_ratio.loc[date] = abs(input_weight.loc[date])
-
-            else:   # for the remaining dates...
-
-                if date not in input_weight.index:    # and if it's not a rebalancing date...
-                    shares.loc[date] = shares.loc[data.index[idx - 1]]
-                    # number of shares unchanged, i.e. NOT rebalanced
-                    fee.loc[date] = 0   # obvsly no fee incurred, since no rebalancing
-                    turnover_ratio.loc[date] = 0    # obvsly turnover is 0, since no rebalancing
-                    nav.loc[date] = nav.loc[data.index[idx - 1]] + sum(shares.loc[date] *
-                                                                       (data.loc[date] - data.loc[data.index[idx - 1]]))
-                    # NAV's increase comes from sum of price increment times shares held over assets
-                    actual_weight.loc[date] = shares.loc[date] * data.loc[date] / nav.loc[date]
-                    # actual weight by definition is value of each asset over NAV
-
-                else:   # and it is a rebalancing date...
-                    shares_before = shares.loc[data.index[idx - 1]]
-                    # shares right before rebalancing equals previous date
-                    nav_before = nav.loc[data.index[idx - 1]] + sum(shares_before * (data.loc[date] -
-                                                                                     data.loc[data.index[idx - 1]]))
-                    # If there's NAN in data or weight, RuntimeError would occur, add more explanation.
-                    try:
-                        nav_after = newton(nav_equation, x0=nav_before, args=(shares_before, input_weight.loc[date],
-                                                                          data.loc[date], fee_rate, nav_before),
-                                       x1=nav_before*max(self.high_risk_fee_rate, self.low_risk_fee_rate))
-                    except RuntimeError:
-                        raise ValueError("Cannot generate NAV series due to unexpected value from data or weight.")
-                    # Use the solver to find NAV after rebalancing s.t. weight after rebalancing is as wanted and fee is
-                    # subtracted from NAV
-                    fee.loc[date] = nav_before - nav_after
-                    nav.loc[date] = nav_after
-                    actual_weight.loc[date] = input_weight.loc[date]
-                    shares.loc[date] = actual_weight.loc[date] * nav_after / data.loc[date]
-                    turnover_ratio.loc[date] = abs(input_weight.loc[date] -
-                                                   actual_weight.loc[actual_weight.index[idx - 1]])
+        shares_arr, weights_arr, nav_arr, fee_arr = _run_backtest(price, weight_arr, is_rebal, fee_rate)
+
+        turnover_arr = np.zeros(price.shape)
+        # obvsly turnover is 0 on non-rebalancing dates
+        turnover_arr[0] = np.abs(weight_arr[0])
+        turnover_arr[rebal_idx[1:]] = np.abs(weight_arr[rebal_idx[1:]] - weights_arr[rebal_idx[1:] - 1])
+        # on rebalancing dates, turnover is the absolute change from actual weight on the previous date to input weight
 
         # --------------------------------------------------------------------------------------------------------------
-        # Step 4: organize the results
-        portfolio_stats['组合净值'] = nav
-        portfolio_stats['交易费用'] = fee
+        # Step 4: organize the results, arrays are wrapped into dataframes only once here
+        dates, assets = self.data.index, self.data.columns
+        portfolio_stats = pd.DataFrame({'组合净值': nav_arr, '交易费用': fee_arr}, index=dates)
         self.backtest_results['回测结果汇总'] = None
         self.backtest_results['组合净值和交易费用'] = portfolio_stats
-        self.backtest_results['归一化资产价格'] = data
-        self.backtest_results['资产持有股数（对应归一化资产价格）'] = shares
-        self.backtest_results['资产权重'] = actual_weight
-        self.backtest_results['资产调仓目标'] = input_weight
-        self.backtest_results['资产换手率'] = turnover_ratio
-    
+        self.backtest_results['归一化资产价格'] = pd.DataFrame(price, index=dates, columns=assets)
+        self.backtest_results['资产持有股数（对应归一化资产价格）'] = pd.DataFrame(shares_arr, index=dates, columns=assets)
+        self.backtest_results['资产权重'] = pd.DataFrame(weights_arr, index=dates, columns=assets)
+        self.backtest_results['资产调仓目标'] = self.weight
+        self.backtest_results['资产换手率'] = pd.DataFrame(turnover_arr, index=dates, columns=assets)
+
     def backtest(self):
         nav_backtest = Single_Asset(ann=self.ann, rf=self.rf,
                                     data=pd.DataFrame(self.backtest_results['组合净值和交易费用']['组合净值']))
         nav_backtest.backtest('组合净值')
-        self.backtest_results['回测结果汇总'] = nav_backtest.backtest_results['组合净值']
 
         # --------------------------------------------------------------------------------------------------------------
         # Calculate turnover ratio
-        years = list(set(self.backtest_results['资产换手率'].index.year))
-        years.sort()
-        self.backtest_results['回测结果汇总']['组合换手率'] = 0
-        for asset in self.backtest_results['资产换手率'].columns:
-            self.backtest_results['回测结果汇总'].loc['整体表现', asset + '换手率'] =\
-                sum(self.backtest_results['资产换手率'][asset])
-            self.backtest_results['回测结果汇总'].loc['整体表现', '组合换手率'] +=\
-                self.backtest_results['回测结果汇总'].loc['整体表现', asset + '换手率']
-            for idx, year in enumerate(years):
-                if idx == 0:
-                    # if the first year only involves one data point, it merely serves as the opening price of the next
-                    # year's series, and is included in next year's turnover
-                    if len(self.backtest_results['资产换手率'].loc[self.backtest_results['资产换手率'].index.year == year,
-                                                           asset]) == 1:
-                        self.backtest_results['回测结果汇总'].loc[years[1], asset + '换手率'] = \
-                            sum(self.backtest_results['资产换手率'].loc[self.backtest_results['资产换手率'].index.year
-                                                                   == years[1], asset]) + \
-                            sum(self.backtest_results['资产换手率'].loc[self.backtest_results['资产换手率'].index.year
-                                                                   == years[0], asset])
-                        continue
-                        # the "continue" here is indispensable, otherwise lines 285-286 will trigger a KeyError
-                    else:
-                        self.backtest_results['回测结果汇总'].loc[year, asset + '换手率'] = \
-                            sum(self.backtest_results['资产换手率'].loc[self.backtest_results['资产换手率'].index.year
-                                                                   == year, asset])
-                elif idx == 1:
-                    # if the first year only involves one data point, the next year's turnover is already calculated
-                    # in the above code section
-                    if len(self.backtest_results['资产换手率'].loc[self.backtest_results['资产换手率'].index.year
-                                                              == years[0], asset]) > 1:
-                        self.backtest_results['回测结果汇总'].loc[year, asset + '换手率'] = \
-                            sum(self.backtest_results['资产换手率'].loc[self.backtest_results['资产换手率'].index.year
-                                                                   == year, asset])
-                else:
-                    self.backtest_results['回测结果汇总'].loc[year, asset + '换手率'] = \
-                        sum(self.backtest_results['资产换手率'].loc[self.backtest_results['资产换手率'].index.year
-                                                               == year, asset])
-
-                self.backtest_results['回测结果汇总'].loc[year, '组合换手率'] += \
-                    self.backtest_results['回测结果汇总'].loc[year, asset + '换手率']
+        turnover_ratio = self.backtest_results['资产换手率']
+        turnover_by_year = turnover_ratio.groupby(turnover_ratio.index.year).sum()
+        if (turnover_ratio.index.year == turnover_by_year.index[0]).sum() == 1 and len(turnover_by_year) > 1:
+            # if the first year only involves one data point, it merely serves as the opening price of the next year's
+            # series, and is included in next year's turnover
+            turnover_by_year.iloc[1] += turnover_by_year.iloc[0]
+            turnover_by_year = turnover_by_year.iloc[1:]
+        turnover = pd.concat([turnover_ratio.sum().to_frame('整体表现').T, turnover_by_year]).add_suffix('换手率')
+        turnover.insert(0, '组合换手率', turnover.sum(axis=1))
+        self.backtest_results['回测结果汇总'] = nav_backtest.backtest_results['组合净值'].join(turnover)
 
     def output(self, output_path: str):
         """
         Save results as an Excel file
         :param str output_path: desired file path of the Excel file containing backtest results
         """
-        writer = pd.ExcelWriter(path=output_path)
-        for key in self.backtest_results.keys():
-            temp = self.backtest_results[key]
-            if key != '回测结果汇总':
-                temp.index = temp.index.date
-            temp.to_excel(writer, sheet_name=key)
-        writer.save()
+        with pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
+            for key, temp in self.backtest_results.items():
+                if key != '回测结果汇总':
+                    temp = temp.set_axis(temp.index.date, axis=0)
+                    # NOT assigning to temp.index directly, which would also alter those in self.backtest_results
+                temp.to_excel(writer, sheet_name=key)
 
     """
     #输出策略分年度、整体表现，绘制净值图          
@@ -1,9 +1,214 @@
+import os
+import re
+import glob
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """
+        Fallback decorator used when numba is not installed, functions decorated then run as plain Python and NumPy
+        """
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+def open_excel_file(input_path: str) -> pd.ExcelFile:
+    """
+    Open a local Excel file, using the calamine engine if available since it parses much faster than openpyxl
+    Sheets of the returned file can be parsed one after another without reading the file again
+    :param str input_path: file path of the Excel file
+    :return pd.ExcelFile: the opened Excel file
+    """
+    try:
+        return pd.ExcelFile(input_path, engine='calamine')
+    except (ImportError, ValueError):
+        # calamine engine requires pandas 2.2 or above as well as python-calamine, otherwise use the default engine
+        return pd.ExcelFile(input_path)
+
+
+_sheet_cache = dict()
+# sheets already read, keyed by (absolute file path, sheet name, version of the Excel file, columns)
+
+
+def _parquet_path(input_path: str, sheet_name: str, version: str) -> str:
+    """
+    File path of the Parquet file caching one sheet of an Excel file, see read_sheets
+    :param str input_path: absolute file path of the Excel file
+    :param str sheet_name: name of the sheet
+    :param str version: version of the Excel file, made of its size and last modification time
+    :return str: file path of the Parquet file, e.g. data.xlsx.数据.<version>.parquet next to data.xlsx
+    """
+    return '%s.%s.%s.parquet' % (input_path, sheet_name, version)
+
+
+def read_sheets(input_path: str, sheet_names: list, usecols=None) -> dict:
+    """
+    Read several sheets of a local Excel file with their first columns as index
+    The Excel file is opened only once for all the sheets, instead of once for each sheet
+    Each sheet is also saved as a Parquet file next to the Excel file, and is read from there instead as long as the
+    Excel file's size and last modification time are exactly as when it's saved, s.t. the same sheet is parsed from
+    Excel only once even across runs, while replacing the Excel file by another one, even an older one, is picked up
+    Sheets read are also cached in memory, the Excel file's size and last modification time being part of the cache
+    key as well
+    :param str input_path: file path of the Excel file
+    :param list sheet_names: names of the sheets
+    :param list usecols: names of the columns needed besides the index, all columns by default; cells of other columns
+    are then not parsed at all, which saves most of the time when only a few assets out of many are backtested
+    :return dict: content of each sheet, copies that can be safely modified
+    """
+    input_path = os.path.abspath(input_path)
+    stat = os.stat(input_path)
+    version = '%d-%d' % (stat.st_size, stat.st_mtime_ns)
+    usecols = None if usecols is None else tuple(usecols)
+
+    sheets_to_parse = []
+    for sheet_name in sheet_names:
+        if (input_path, sheet_name, version, usecols) in _sheet_cache:
+            continue
+        if usecols is not None and (input_path, sheet_name, version, None) in _sheet_cache:
+            _sheet_cache[(input_path, sheet_name, version, usecols)] = \
+                _sheet_cache[(input_path, sheet_name, version, None)][list(usecols)]
+            # the entire sheet has already been read, so merely select columns from it
+            continue
+        parquet_path = _parquet_path(input_path, sheet_name, version)
+        if os.path.exists(parquet_path):
+            try:
+                _sheet_cache[(input_path, sheet_name, version, usecols)] = pd.read_parquet(
+                    parquet_path, columns=None if usecols is None else list(usecols))
+                continue
+            except (ImportError, OSError, TypeError, ValueError):
+                pass
+                # the Parquet file is merely a cache, so if it can't be read, e.g. no Parquet engine installed, or the
+                # file truncated or corrupt, parse the sheet from Excel instead, and the Parquet file gets overwritten
+                # once the entire sheet is parsed
+        sheets_to_parse.append(sheet_name)
+
+    if sheets_to_parse:
+        with open_excel_file(input_path) as excel_file:
+            for sheet_name in sheets_to_parse:
+                if usecols is None:
+                    df = excel_file.parse(sheet_name, index_col=0)
+                    prefix = _parquet_path(input_path, sheet_name, '')[:-len('.parquet')]
+                    for stale_path in glob.glob(glob.escape(prefix) + '*.parquet'):
+                        if re.fullmatch(r'\d+-\d+', stale_path[len(prefix):-len('.parquet')]):
+                            # NOT matching Parquet files of other sheets whose names merely start with this one
+                            try:
+                                os.remove(stale_path)
+                            except OSError:
+                                pass
+                            # Parquet files saved for earlier versions of the Excel file are of no use any more
+                    try:
+                        df.to_parquet(_parquet_path(input_path, sheet_name, version))
+                    except (ImportError, OSError, TypeError, ValueError):
+                        pass
+                        # the Parquet file is merely a cache, so never fail if it can't be written, e.g. no Parquet
+                        # engine installed, directory not writable, or columns of mixed types
+                else:
+                    index_name = excel_file.parse(sheet_name, nrows=0).columns[0]
+                    # only the header row is parsed to learn the name of the index column
+                    df = excel_file.parse(sheet_name, index_col=0, usecols=[index_name, *usecols])[list(usecols)]
+                    # NOT saved as Parquet, since it's only part of the sheet
+                _sheet_cache[(input_path, sheet_name, version, usecols)] = df
+
+    return {sheet_name: _sheet_cache[(input_path, sheet_name, version, usecols)].copy() for sheet_name in sheet_names}
+    # cached dataframes are shared among callers, hence return copies
+
+
+def read_sheet(input_path: str, sheet_name: str, usecols=None) -> pd.DataFrame:
+    """
+    Read one sheet of a local Excel file with its first column as index, see read_sheets for caching
+    :param str input_path: file path of the Excel file
+    :param str sheet_name: name of the sheet
+    :param list usecols: names of the columns needed besides the index, all columns by default
+    :return pd.DataFrame: content of the sheet, a copy that can be safely modified
+    """
+    return read_sheets(input_path, [sheet_name], usecols=usecols)[sheet_name]
+
+
+STATS_COLUMNS = ['区间收益率', '年化收益率', '年化波动率', '最大回撤', '夏普比率', '卡玛比率',
+                 '最大回撤起始时间', '最大回撤形成时间', '最大回撤恢复时间']
+# columns of backtest results, in the same order as stats returned by Single_Asset.backtest_series
+
+
+@njit(['Tuple((float64, int64, int64, int64))(float64[:], int64, int64)',
+       'Tuple((float64, int64, int64, int64))(float32[:], int64, int64)'], cache=True)
+def _mdd_and_recovery(nav_values: np.ndarray, begin: int, end: int):
+    """
+    Calculate maximum drawdown of nav_values[begin:end] and find when it recovers, in one single pass over the NAV
+    The running maximum, the deepest drawdown and where it starts are tracked together, then the search for recovery
+    stops at the first NAV that is back to where mdd starts
+    :param np.ndarray nav_values: the entire closing price series
+    :param int begin: position where the period to calculate mdd begins
+    :param int end: position where the period to calculate mdd ends, exclusive as in slicing
+    :return tuple: mdd, positions in nav_values where mdd starts, forms and recovers (-1 if it hasn't recovered yet)
+    Signatures are given explicitly s.t. both float64 and float32 versions are compiled, or loaded from numba's cache,
+    when the module is imported instead of within the first backtest
+    """
+    peak = start = formation = begin
+    mdd = 0.0
+    for i in range(begin, end):
+        if nav_values[i] > nav_values[peak]:
+            peak = i
+            # strictly greater s.t. mdd starts from the first date when the highest NAV is reached
+        dd = 1 - nav_values[i] / nav_values[peak]
+        if dd > mdd:
+            mdd, start, formation = dd, peak, i
+
+    recovery = -1
+    for i in range(start + 1, len(nav_values)):
+        # mdd might recover after the period ends, hence look for it in the entire series
+        if nav_values[i] >= nav_values[start]:
+            recovery = i
+            break
+    return mdd, start, formation, recovery
+
+
+def backtest_column(nav_series: pd.Series, ann: int, rf=0.0, dtype=np.float64) -> pd.DataFrame:
+    """
+    Backtest the closing price series of one asset, the same as Single_Asset.backtest but as a plain function
+    Since nothing is shared between calls, backtests of different assets can run in parallel processes
+    :param pd.Series nav_series: closing price series of one asset, sorted and without empty cells
+    :param int ann: number of periods used to annualize statistics, see Single_Asset
+    :param float rf: risk-free rate, default 0
+    :param dtype: floating point type used to calculate stats, see Single_Asset
+    :return pd.DataFrame: a DataFrame of stats, one row for the entire period and one row for each year
+    """
+    return Single_Asset(ann=ann, rf=rf, dtype=dtype).backtest_nav_series(nav_series)
+
+
+_worker_data = _worker_params = None
+# data and parameters in each worker process of Single_Asset.backtest_all, data being sent only once per process
+
+
+def _init_worker(ann: int, rf: float, dtype, data: pd.DataFrame):
+    """
+    Initialize a worker process of Single_Asset.backtest_all with its own copy of data and parameters
+    :param int ann: number of periods used to annualize statistics, see Single_Asset
+    :param float rf: risk-free rate
+    :param dtype: floating point type used to calculate stats
+    :param pd.DataFrame data: closing price series of all assets
+    """
+    global _worker_data, _worker_params
+    _worker_data, _worker_params = data, dict(ann=ann, rf=rf, dtype=dtype)
+
+
+def _backtest_asset_in_worker(asset_name: str) -> pd.DataFrame:
+    """
+    Backtest one asset in a worker process of Single_Asset.backtest_all
+    :param str asset_name: name of the asset
+    :return pd.DataFrame: a DataFrame of stats, see backtest_column
+    """
+    return backtest_column(_worker_data[asset_name].dropna(), **_worker_params)
+    # since self.data can contain multiple assets, there might be empty cells
+
 
 class Single_Asset:
-    def __init__(self, ann: int, rf=0.0, data=None):
+    def __init__(self, ann: int, rf=0.0, data=None, dtype=np.float64):
         """
         Initialize a backtester for one single asset
         Think of it as sth that takes in a closing price series and spits out several stats
@@ -13,22 +218,35 @@ class Single_Asset:
         :param float rf: risk-free rate, default 0
         :param pd.DataFrame data: closing price series, so that you can also use this backtester after some other
         Python programs without loading from a local Excel file
+        :param dtype: floating point type used to calculate stats, either np.float64 by default or np.float32, which
+        halves memory moved by each pass over closing price series, still precise enough for return stats but results
+        differ from those in np.float64 after roughly the 7th significant digit
         """
         self.ann = ann
         self.rf = rf
+        self.dtype = dtype
         self.input_path = self.output_path = None
         self.data = data
         self.backtest_results = dict()
 
-    def load_sheet_from_file(self, input_path: str, sheet_name='Sheet1'):
+    def load_sheet_from_file(self, input_path: str, sheet_name='Sheet1', asset_name_list=None):
         """
         Load closing price series data from a local Excel file
         :param str input_path: file path of the Excel file
         :param str sheet_name: name of the sheet containing closing price series, 'Sheet1' by default
+        :param list asset_name_list: names of assets to load, all assets in the sheet by default
         """
         self.input_path = input_path
-        self.data = pd.read_excel(self.input_path, sheet_name=sheet_name, index_col=0)
-        self.data.sort_index(ascending=True, inplace=True)
+        self.load_data(data=read_sheet(self.input_path, sheet_name, usecols=asset_name_list))
+
+    def load_data(self, data: pd.DataFrame):
+        """
+        Load closing price series data that is already loaded elsewhere, e.g. shared with a Portfolio backtester s.t.
+        the same Excel sheet is not parsed twice
+        The given dataframe is NOT modified
+        :param pd.DataFrame data: closing price series
+        """
+        self.data = data.sort_index(ascending=True)
         # if self.data is NOT sorted, slicing and backtesting below might lead to errors; but if self.data is already
         # sorted as it is in most cases, this sort will bear no actual effect
 
@@ -40,126 +258,164 @@ class Single_Asset:
         """
         self.data = self.data.loc[pd.to_datetime(start_date):pd.to_datetime(end_date)]
 
-    def backtest_series(self, nav_series: pd.Series, annualize: bool):
+    def backtest_series(self, nav_values: np.ndarray, nav_dates: np.ndarray, begin: int, end: int,
+                        annualize: bool) -> tuple:
         """
-        Backtest the given closing price series, regardless of its length
-        So that this method can be used to both backtest the entire period, as well as backtest by year as long as
-        nav_series is properly sliced
-        :param pd.Series nav_series: closing price series used to calculate stats
+        Backtest the closing price series between the given positions, regardless of its length
+        So that this method can be used to both backtest the entire period, as well as backtest by year as long as the
+        positions are properly set
+        :param np.ndarray nav_values: the entire closing price series
+        :param np.ndarray nav_dates: dates of the entire closing price series, as datetime64[D]
+        :param int begin: position where the backtest period begins
+        :param int end: position where the backtest period ends, exclusive as in slicing
         :param bool annualize: whether return is annualized
-        :return pd.DataFrame: a DataFrame of stats
+        :return tuple: stats of the backtest period, in the same order as STATS_COLUMNS
         """
-        ret_series = nav_series.pct_change()
+        nav = nav_values[begin:end]
+        ret = nav[1:] / nav[:-1] - 1
+        # returns computed directly on the NumPy array, without the initial np.nan pct_change() would give
 
         # --------------------------------------------------------------------------------------------------------------
         # Calculate return and stdev
-        holding_period_return = nav_series.iloc[-1] / nav_series.iloc[0] - 1
-        annualized_return = (holding_period_return + 1) ** (self.ann / (len(ret_series) - 1)) - 1 if annualize is True\
+        holding_period_return = nav[-1] / nav[0] - 1
+        annualized_return = np.expm1(np.log1p(holding_period_return) * (self.ann / len(ret))) if annualize is True\
             else holding_period_return
-        # should take ((len(ret_series) - 1) / self.ann)-th root of HPR, i.e. raise it to the
-        # (self.ann / (len(ret_series) - 1))-th power
-        # len(ret_series) needs to minus 1 because of the initial np.nan as a result of pct_change()
-        annualized_stdev = np.nanstd(ret_series, ddof=1) * np.sqrt(self.ann)
+        # should take (len(ret) / self.ann)-th root of HPR, i.e. raise it to the (self.ann / len(ret))-th power
+        # done via log1p and expm1, which stay accurate when HPR is close to 0; like the power, it gives np.nan if the
+        # asset loses more than all it's worth
+        annualized_stdev = ret.std(ddof=1) * np.sqrt(self.ann)
 
         # --------------------------------------------------------------------------------------------------------------
         # Calculate mdd and ratios
-        mdd, mdd_start, mdd_formation = self.mdd(nav_series)
+        mdd, mdd_start, mdd_formation, mdd_recovery = _mdd_and_recovery(nav_values, begin, end)
+        mdd_start_date, mdd_formation_date = nav_dates[[mdd_start, mdd_formation]].tolist()
+        # both positions are converted to dates at once, tolist() of datetime64[D] gives datetime.date
+        mdd_recovery_date = nav_dates[mdd_recovery].item() if mdd_recovery >= 0 else '尚未恢复'
 
         sharpe = (annualized_return - self.rf) / annualized_stdev
         calmar = (annualized_return - self.rf) / mdd if mdd > 0 else np.nan
 
         # --------------------------------------------------------------------------------------------------------------
-        # Store results to the dataframe
-        df = pd.DataFrame(
-            {'区间收益率': [holding_period_return], '年化收益率': [annualized_return],
-             '年化波动率': [annualized_stdev], '最大回撤': [mdd], '夏普比率': [sharpe], '卡玛比率': [calmar],
-             '最大回撤起始时间': [mdd_start], '最大回撤形成时间': [mdd_formation], '最大回撤恢复时间': [np.nan]
-             })
-
-        return df
+        # Store results to a plain tuple, DataFrame is built only once by the caller
+        return (*map(self.dtype, (holding_period_return, annualized_return, annualized_stdev, mdd, sharpe, calmar)),
+                mdd_start_date, mdd_formation_date, mdd_recovery_date)
+        # numeric stats are cast to self.dtype, since e.g. np.sqrt(self.ann) or the compiled kernel give np.float64,
+        # s.t. all numeric columns of the result share one dtype
 
     def backtest(self, asset_name: str):
         """
         Run backtest on the selected asset
         :param str asset_name: name of the asset, used to locate the column among many assets
         """
+        self.backtest_results[asset_name] = self.backtest_asset(asset_name)
+
+    def backtest_asset(self, asset_name: str) -> pd.DataFrame:
+        """
+        Run backtest on the selected asset, without storing results to self.backtest_results
+        :param str asset_name: name of the asset, used to locate the column among many assets
+        :return pd.DataFrame: a DataFrame of stats, one row for the entire period and one row for each year
+        """
         if asset_name not in self.data.columns:
             raise ValueError('invalid asset name')
-        nav_series = self.data[asset_name].dropna()
+        return self.backtest_nav_series(self.data[asset_name].dropna())
         # since self.data can contain multiple assets, there might be empty cells
 
-        df_list = []
+    def backtest_all(self, asset_name_list=None, max_workers=1):
+        """
+        Run backtest on several assets, results of which can then be saved by one single call of output
+        Backtests of different assets are independent, hence can run in parallel processes
+        :param list asset_name_list: list of names of assets to backtest, all assets in self.data by default
+        :param int max_workers: number of processes, None for as many as CPUs; 1 by default, i.e. backtest one asset
+        after another in the current process, since starting processes costs more than backtesting a few assets
+        """
+        asset_name_list = list(self.data.columns) if asset_name_list is None else list(asset_name_list)
+        if max_workers == 1:
+            for asset in asset_name_list:
+                self.backtest(asset)
+        else:
+            if not set(asset_name_list).issubset(self.data.columns):
+                raise ValueError('invalid asset name')
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=(self.ann, self.rf, self.dtype, self.data)) as executor:
+                # self.data is sent to each process only once when it starts, instead of once for every asset
+                self.backtest_results.update(zip(asset_name_list,
+                                                 executor.map(_backtest_asset_in_worker, asset_name_list)))
+
+    def backtest_nav_series(self, nav_series: pd.Series) -> pd.DataFrame:
+        """
+        Backtest the given closing price series both for the entire period and by year
+        Unlike backtest, this method doesn't rely on self.data or self.backtest_results, see also backtest_column
+        :param pd.Series nav_series: closing price series of one asset, sorted and without empty cells
+        :return pd.DataFrame: a DataFrame of stats, one row for the entire period and one row for each year
+        """
+        nav_values = nav_series.to_numpy(dtype=self.dtype, copy=True)
+        nav_dates = nav_series.index.values.astype('datetime64[D]')
+        # all stats below are calculated on these NumPy arrays, each period is merely a pair of positions
+        # values are copied since with copy-on-write, pandas might give a read-only view, which doesn't match the
+        # signatures _mdd_and_recovery is compiled for
+
+        records, labels = [], []
 
         # --------------------------------------------------------------------------------------------------------------
         # Backtest the entire period
-        df_all = self.backtest_series(nav_series, annualize=True)
-        try:
-            df_all['最大回撤恢复时间'] = nav_series.loc[
-                (nav_series >= nav_series.loc[df_all['最大回撤起始时间']][0])
-                & (pd.to_datetime(nav_series.index) > pd.to_datetime(df_all['最大回撤起始时间'][0]))].index[0].date()
-        except:
-            df_all['最大回撤恢复时间'] = '尚未恢复'
-        df_all.index = ['整体表现']
-        df_list.append(df_all)
+        records.append(self.backtest_series(nav_values, nav_dates, 0, len(nav_values), annualize=True))
+        labels.append('整体表现')
 
         # --------------------------------------------------------------------------------------------------------------
         # Backtest by year
-        years = list(set(nav_series.index.year))
-        years.sort()
-        for idx, year in enumerate(years):
-            nav_series_by_year = nav_series.loc[nav_series.index.year == year]
-            if idx == 0:
+        years = nav_series.index.year.to_numpy()
+        # year of each date is computed only once; since nav_series is sorted, dates of the same year are contiguous
+        unique_years, year_starts = np.unique(years, return_index=True)
+        year_ends = np.append(year_starts[1:], len(years))
+        for year, year_start, year_end in zip(unique_years, year_starts, year_ends):
+            year_offset = max(year_start - 1, 0)
+            # last year's close serves as the opening price of this year's series, hence start 1 position earlier
+            if year_end - year_offset == 1:
                 # if the first year only involves one data point, it merely serves as the opening price of the next
                 # year's series
-                if len(nav_series_by_year) == 1:
-                    continue
-            else:
-                last_year_close = pd.Series([nav_series.loc[nav_series.index.year == years[idx - 1]].iloc[-1]])
-                last_year_close.index = [nav_series.loc[nav_series.index.year == years[idx - 1]].index[-1]]
-                last_year_close.name = nav_series_by_year.name
-                nav_series_by_year = last_year_close.append(nav_series_by_year)
-            df_by_year = self.backtest_series(nav_series_by_year, annualize=False)
-            try:
-                df_by_year['最大回撤恢复时间'] = nav_series.loc[
-                    (nav_series >= nav_series.loc[df_by_year['最大回撤起始时间']][0])
-                    & (pd.to_datetime(nav_series.index) > pd.to_datetime(df_by_year['最大回撤起始时间'][0]))].index[0].date()
-            except:
-                df_by_year['最大回撤恢复时间'] = '尚未恢复'
-            df_by_year.index = [year]
-            df_list.append(df_by_year)
+                continue
+            records.append(self.backtest_series(nav_values, nav_dates, year_offset, year_end, annualize=False))
+            labels.append(int(year))
 
         # --------------------------------------------------------------------------------------------------------------
-        # Concatenate results to get one holistic DataFrame
-        df = pd.concat(df_list)
-        self.backtest_results[asset_name] = df
-
-    def mdd(self, nav_series: pd.Series):
-        """
-        Calculate maximum drawdown using the given price series
-        :param pd.Series nav_series: price series used to calculate mdd stats
-        :return : stats
-        """
-        dd = nav_series.div(nav_series.cummax()).sub(1)
-        # NAV divided by its cumulative maximum then subtracted by 1 gives the drawdown series
-        mdd, formation = dd.min(), dd.idxmin()
-        formation = formation.date()
-        start = nav_series.loc[:formation].idxmax()
-        start = start.date()
-        return -mdd, start, formation
+        # Assemble results into one holistic DataFrame
+        return pd.DataFrame.from_records(records, index=labels, columns=STATS_COLUMNS)
 
     def output(self, output_path: str, asset_name_list: list):
         """
-        Save results as an Excel file
-        :param str output_path: desired file path of the Excel file containing backtest results
+        Save results as an Excel file, one sheet for each asset
+        If output_path ends with .csv or .parquet, results of all assets are instead saved as one single table with the
+        asset name as an extra index level, which is much faster to write than an Excel file
+        :param str output_path: desired file path of the Excel, CSV or Parquet file containing backtest results
         :param list asset_name_list: list of names of assets whose backtest results are to be output
         """
-        writer = pd.ExcelWriter(output_path, engine='xlsxwriter')
+        results = dict()
         for asset in asset_name_list:
             if asset not in self.backtest_results.keys():
                 print('invalid asset %s, either no data or hasn\'t been backtested.' % asset)
             else:
-                self.backtest_results[asset].to_excel(writer, sheet_name=asset)
-        writer.save()
+                results[asset] = self.backtest_results[asset]
+
+        file_format = os.path.splitext(output_path)[1].lower()
+        if file_format in ('.csv', '.parquet'):
+            if results:
+                df = pd.concat(results, names=['资产', '区间'])
+            else:
+                df = pd.DataFrame(columns=STATS_COLUMNS, index=pd.MultiIndex.from_tuples([], names=['资产', '区间']))
+                # nothing to output, still write a table with headers only, just like an Excel file with no sheets
+            if file_format == '.csv':
+                df.to_csv(output_path, encoding='utf-8-sig')
+                # with BOM s.t. Excel recognizes the Chinese characters when opening the CSV file
+            else:
+                df = df.reset_index()
+                object_columns = df.columns[df.dtypes == object]
+                df[object_columns] = df[object_columns].astype(str)
+                # columns like 区间 and 最大回撤恢复时间 mix years or dates with words, which Parquet can't store
+                df.to_parquet(output_path, index=False)
+        else:
+            with pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
+                for asset, df in results.items():
+                    df.to_excel(writer, sheet_name=asset)
 
 
 if __name__ == '__main__':
@@ -169,7 +425,6 @@ if __name__ == '__main__':
     start_date = None
     end_date = None
     a.slice(start_date, end_date)
-    for asset in a.data.columns:
-        a.backtest(asset)
+    a.backtest_all()
     output_path = r'..\测试\05带杠杆和做空\单资产回测结果.xlsx'
     a.output(output_path=output_path, asset_name_list=list(a.data.columns))
@@ -1,5 +1,5 @@
 from Codes.Portfolio import Portfolio
-from Codes.Single_Asset import Single_Asset
+from Codes.Single_Asset import Single_Asset, read_sheets
 
 
 if __name__ == "__main__":
@@ -7,6 +7,9 @@ if __name__ == "__main__":
     # Initialize parameters
     ann = 250
     rf = 0
+    max_workers = 1
+    # number of processes used to backtest single assets in parallel, None for as many as CPUs; 1 for no parallelism,
+    # which is faster for a handful of assets since each process has to start and import pandas and numba first
     start_date = None
     end_date = None
     input_path = r'Data\data.xlsx'
@@ -18,19 +21,23 @@ if __name__ == "__main__":
     low_risk_name_list = ['中债-总财富(总值)指数', '中债-信用债总财富(总值)指数']
     low_risk_fee_rate = 0.0002
 
+    # ------------------------------------------------------------------------------------------------------------------
+    # Load data, each sheet is parsed only once and shared by both backtesters
+    sheets = read_sheets(input_path=input_path, sheet_names=['数据', '权重'])
+    data, weight = sheets['数据'], sheets['权重']
+
     # ------------------------------------------------------------------------------------------------------------------
     # Single asset backtesting
     single_asset = Single_Asset(ann=ann, rf=rf)
-    single_asset.load_sheet_from_file(input_path=input_path, sheet_name='数据')
+    single_asset.load_data(data=data)
     single_asset.slice(start_date, end_date)
-    for asset in single_asset.data.columns:
-        single_asset.backtest(asset)
+    single_asset.backtest_all(max_workers=max_workers)
     single_asset.output(output_path=output_path_single_asset, asset_name_list=list(single_asset.data.columns))
 
     # ------------------------------------------------------------------------------------------------------------------
     # Portfolio backtesting
     portfolio = Portfolio(ann=ann, rf=rf)
-    portfolio.load_sheets_from_file(input_path=input_path, data_sheet_name='数据', weight_sheet_name='权重')
+    portfolio.load_data(data=data, weight=weight)
     portfolio.load_fee_rates(high_risk_name_list=high_risk_name_list, high_risk_fee_rate=high_risk_fee_rate,
                              low_risk_name_list=low_risk_name_list, low_risk_fee_rate=low_risk_fee_rate)
     portfolio.slice(start_date, end_date)